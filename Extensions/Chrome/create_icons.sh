@@ -9,9 +9,11 @@ cd "$(dirname "$0")/icons"
 create_icon() {
     size=$1
     filename="icon-${size}.png"
+    # Per-size temp file so sizes can be rendered concurrently
+    tmp_svg="temp-${size}.svg"
     
     # Create a simple SVG and convert to PNG using Quick Look
-    cat > temp.svg << EOF
+    cat > "$tmp_svg" << EOF
 <svg width="${size}" height="${size}" xmlns="http://www.w3.org/2000/svg">
   <rect width="${size}" height="${size}" fill="#4A90E2"/>
   <text x="50%" y="50%" font-family="Arial, sans-serif" font-size="$(($size/3))" font-weight="bold" fill="white" text-anchor="middle" dominant-baseline="middle">SF</text>
@@ -19,8 +21,8 @@ create_icon() {
 EOF
     
     # Convert SVG to PNG using qlmanage
-    qlmanage -t -s ${size} -o . temp.svg >/dev/null 2>&1
-    mv temp.svg.png "$filename" 2>/dev/null || true
+    qlmanage -t -s ${size} -o . "$tmp_svg" >/dev/null 2>&1
+    mv "$tmp_svg.png" "$filename" 2>/dev/null || true
     
     # If qlmanage didn't work, create a simple colored square
     if [ ! -f "$filename" ]; then
@@ -51,7 +53,7 @@ print(f"Created $filename")
 EOF
     fi
     
-    rm -f temp.svg temp.svg.png
+    rm -f "$tmp_svg" "$tmp_svg.png"
 }
 
 # Check if Python PIL is available, if not create simple colored squares
@@ -81,9 +83,11 @@ if ! python3 -c "import PIL" 2>/dev/null; then
     done
 else
     echo "Creating icons with Python PIL..."
+    # Each size is independent, so render them in parallel
     for size in 16 32 48 128; do
-        create_icon $size
+        create_icon $size &
     done
+    wait
 fi
 
 echo "Icon creation complete!"
@@ -6,140 +6,271 @@ Handles communication between Chrome extension and SwiftFetch app
 
 import sys
 import json
+import asyncio
 import struct
 import logging
-import subprocess
+import logging.handlers
+import queue
 import os
+import stat
 
-# Set up logging for debugging
-logging.basicConfig(
-    filename='/tmp/swiftfetch_native.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+# Prefer orjson when it's installed; it encodes straight to bytes
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# Set up logging. Only warnings and errors are logged unless SWIFTFETCH_DEBUG
+# is set. When run as the host, records are queued on the message loop and
+# written to the log file by a background listener thread.
+LOG_LEVEL = logging.DEBUG if os.environ.get('SWIFTFETCH_DEBUG') else logging.WARNING
+
+_log_queue = queue.SimpleQueue()
+
+# Debug builds of the app also append to this file (logError in
+# NativeMessagingHandler.swift). It reopens the path on every write, so its
+# lines simply land in whichever file is current and rotate along with ours.
+_log_file_handler = logging.handlers.RotatingFileHandler(
+    '/tmp/swiftfetch_native.log',
+    maxBytes=1 << 20,
+    backupCount=1,
+    delay=True
 )
+_log_file_handler.setLevel(LOG_LEVEL)
+_log_file_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_file_handler, respect_handler_level=True
+)
+
+logger = logging.getLogger(__name__)
+
+# Message length header: 32-bit little-endian (native order on Intel and
+# Apple Silicon Macs)
+_LEN = struct.Struct('<I')
 
-def read_message():
+# Incoming messages must be non-empty and under 1 MiB, the same sanity
+# check NativeHost/main.swift applies
+MAX_MESSAGE_SIZE = 1 << 20
+
+# Known SwiftFetch app locations, in order of preference
+APP_PATHS = [
+    "/Applications/SwiftFetch.app",
+    "/Users/devitripathy/Library/Developer/Xcode/DerivedData/SwiftFetch-hkguncbcnfxahpcsjswpmkdlbqjt/Build/Products/Debug/SwiftFetch.app"
+]
+
+def find_app_path():
+    """Return the first installed SwiftFetch app path, or None"""
+    return next((path for path in APP_PATHS if os.path.exists(path)), None)
+
+# Resolved once at startup; re-checked if it goes missing or a launch fails
+APP_PATH = find_app_path()
+
+async def read_message(reader):
     """Read a message from Chrome using Native Messaging protocol"""
-    # Read the message length (first 4 bytes)
-    raw_length = sys.stdin.buffer.read(4)
-    
-    if not raw_length:
-        return None
-    
-    # Unpack message length
-    message_length = struct.unpack('I', raw_length)[0]
-    
-    # Read the message
-    message = sys.stdin.buffer.read(message_length).decode('utf-8')
-    
-    return json.loads(message)
+    while True:
+        try:
+            # Read the message length (first 4 bytes)
+            raw_length = await reader.readexactly(4)
+            
+            # Unpack message length
+            message_length = _LEN.unpack(raw_length)[0]
+            
+            if not 0 < message_length < MAX_MESSAGE_SIZE:
+                # The stream can't be resynchronized past a bogus header
+                logger.error("Invalid message length: %d bytes", message_length)
+                return None
+            
+            # Read the message
+            message = await reader.readexactly(message_length)
+        except asyncio.IncompleteReadError:
+            return None
+        
+        try:
+            return _loads(message)
+        except ValueError as e:
+            # The frame was fully consumed, so report it and read the next one
+            write_error(e)
 
 def write_message(message):
     """Write a message to Chrome using Native Messaging protocol"""
-    encoded = json.dumps(message).encode('utf-8')
+    encoded = _dumps(message)
     
-    # Write message length
-    sys.stdout.buffer.write(struct.pack('I', len(encoded)))
+    # Build length header and message in one buffer and write it at once
+    frame = bytearray(_LEN.size + len(encoded))
+    _LEN.pack_into(frame, 0, len(encoded))
+    frame[_LEN.size:] = encoded
     
-    # Write the message
-    sys.stdout.buffer.write(encoded)
-    sys.stdout.flush()
+    sys.stdout.buffer.write(frame)
+    sys.stdout.buffer.flush()
 
-def handle_download(url, filename=None):
+async def handle_download(url, filename=None):
     """Send download to SwiftFetch app"""
+    global APP_PATH
+    
     try:
-        # Find SwiftFetch app
-        app_paths = [
-            "/Applications/SwiftFetch.app",
-            "/Users/devitripathy/Library/Developer/Xcode/DerivedData/SwiftFetch-hkguncbcnfxahpcsjswpmkdlbqjt/Build/Products/Debug/SwiftFetch.app"
-        ]
+        if not APP_PATH or not os.path.exists(APP_PATH):
+            APP_PATH = find_app_path()
         
-        app_path = None
-        for path in app_paths:
-            if os.path.exists(path):
-                app_path = path
-                break
-        
-        if not app_path:
+        if not APP_PATH:
             return False
         
-        # Use open command with URL
-        subprocess.run(['open', '-a', app_path, url], check=True)
+        # Hand the URL to the app via open. Keep the child off our stdio
+        # so it can't touch the message stream.
+        proc = await asyncio.create_subprocess_exec(
+            'open', '-a', APP_PATH, url,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL
+        )
         
-        return True
+        if await proc.wait() == 0:
+            return True
+        
+        # The cached app may be stale; look it up again for the next download
+        APP_PATH = find_app_path()
+        return False
     except Exception as e:
-        logging.error(f"Error handling download: {e}")
+        logger.error("Error handling download: %s", e)
+        APP_PATH = find_app_path()
         return False
 
-def main():
-    logging.info("Native host started")
-    
-    while True:
-        try:
-            message = read_message()
+async def handle_message(message):
+    """Handle a single message and write its response"""
+    try:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Received message: %s", message)
+        
+        # Handle different message types
+        msg_type = message.get('type', '')
+        
+        if msg_type == 'ping':
+            # Respond to ping
+            response = {
+                'type': 'pong',
+                'status': 'connected',
+                'version': '1.0.0'
+            }
+            write_message(response)
             
-            if not message:
-                break
+        elif msg_type == 'download':
+            # Handle download request
+            url = message.get('url', '')
+            filename = message.get('filename', '')
             
-            logging.info(f"Received message: {message}")
+            success = await handle_download(url, filename)
             
-            # Handle different message types
-            msg_type = message.get('type', '')
+            response = {
+                'type': 'download_response',
+                'success': success,
+                'url': url
+            }
+            write_message(response)
             
-            if msg_type == 'ping':
-                # Respond to ping
-                response = {
-                    'type': 'pong',
-                    'status': 'connected',
-                    'version': '1.0.0'
-                }
-                write_message(response)
-                
-            elif msg_type == 'download':
-                # Handle download request
-                url = message.get('url', '')
-                filename = message.get('filename', '')
-                
-                success = handle_download(url, filename)
-                
-                response = {
-                    'type': 'download_response',
-                    'success': success,
-                    'url': url
-                }
-                write_message(response)
-                
-            elif msg_type == 'status':
-                # Return status
-                response = {
-                    'type': 'status_response',
-                    'connected': True,
-                    'app_running': True
-                }
-                write_message(response)
-                
-            else:
-                # Unknown message type
-                response = {
-                    'type': 'error',
-                    'message': f'Unknown message type: {msg_type}'
-                }
-                write_message(response)
-                
-            logging.info(f"Sent response: {response}")
+        elif msg_type == 'status':
+            # Return status
+            response = {
+                'type': 'status_response',
+                'connected': True,
+                'app_running': True
+            }
+            write_message(response)
             
-        except Exception as e:
-            logging.error(f"Error processing message: {e}")
-            error_response = {
+        else:
+            # Unknown message type
+            response = {
                 'type': 'error',
-                'message': str(e)
+                'message': f'Unknown message type: {msg_type}'
             }
-            try:
-                write_message(error_response)
-            except:
-                pass
+            write_message(response)
+            
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sent response: %s", response)
+        
+    except Exception as e:
+        write_error(e)
+
+def write_error(error):
+    """Log an error and report it to Chrome"""
+    logger.error("Error processing message: %s", error)
+    error_response = {
+        'type': 'error',
+        'message': str(error)
+    }
+    try:
+        write_message(error_response)
+    except:
+        pass
+
+async def feed_reader(reader):
+    """Feed stdin into reader using blocking reads in a worker thread"""
+    loop = asyncio.get_running_loop()
+    
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, sys.stdin.buffer.read1, 65536)
+            if not chunk:
+                reader.feed_eof()
+                break
+            reader.feed_data(chunk)
+    except Exception as e:
+        # Hand read errors to the reader so main() stops instead of waiting
+        reader.set_exception(e)
+
+async def main():
+    logger.info("Native host started")
     
-    logging.info("Native host exiting")
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    
+    mode = os.fstat(sys.stdin.fileno()).st_mode
+    if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+    else:
+        # Regular files and devices (e.g. native_host.py < messages.bin)
+        # can't use a pipe transport. Keep a reference to the task, since
+        # the event loop only holds a weak one.
+        feeder = asyncio.create_task(feed_reader(reader))
+    
+    # Messages are handled concurrently so a slow download launch doesn't
+    # hold up ping/status traffic behind it
+    tasks = set()
+    
+    while True:
+        try:
+            message = await read_message(reader)
+        except Exception as e:
+            # Stream errors stick to the reader, so retrying would spin
+            logger.error("Error reading message: %s", e)
+            break
+        
+        if not message:
+            break
+        
+        task = asyncio.create_task(handle_message(message))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    
+    # Let in-flight downloads finish before exiting
+    if tasks:
+        await asyncio.gather(*tasks)
+    
+    logger.info("Native host exiting")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # Only route logging through the queue when running as the host, so
+    # importers don't get records stuck in a queue nobody drains
+    logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+    logging.getLogger().setLevel(LOG_LEVEL)
+    _log_listener.start()
+    try:
+        asyncio.run(main())
+    finally:
+        _log_listener.stop()
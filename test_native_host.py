@@ -5,7 +5,9 @@ import struct
 import json
 import subprocess
 
-def send_native_message(message):
+NATIVE_HOST = '/Users/devitripathy/code/download_manager/SwiftFetch/SwiftFetch/Resources/native_host.py'
+
+def send_native_message(proc, message):
     """Send a message using native messaging protocol"""
     encoded = json.dumps(message).encode('utf-8')
     
@@ -13,31 +15,41 @@ def send_native_message(message):
     length_bytes = struct.pack('I', len(encoded))
     full_message = length_bytes + encoded
     
-    # Run the native host
-    proc = subprocess.Popen(
-        ['/Users/devitripathy/code/download_manager/SwiftFetch/SwiftFetch/Resources/native_host.py'],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    # Send message and get response
-    stdout, stderr = proc.communicate(input=full_message)
+    # Send message to the running host
+    proc.stdin.write(full_message)
+    proc.stdin.flush()
     
     # Parse response
-    if len(stdout) >= 4:
-        response_length = struct.unpack('I', stdout[:4])[0]
-        response = stdout[4:4+response_length].decode('utf-8')
+    length_bytes = proc.stdout.read(4)
+    if len(length_bytes) == 4:
+        response_length = struct.unpack('I', length_bytes)[0]
+        response = proc.stdout.read(response_length).decode('utf-8')
         return json.loads(response)
     
     return None
 
-# Test ping
-print("Testing ping...")
-response = send_native_message({"type": "ping"})
-print(f"Response: {response}")
+# Start the native host once and reuse it for every test message
+proc = subprocess.Popen(
+    [NATIVE_HOST],
+    stdin=subprocess.PIPE,
+    stdout=subprocess.PIPE,
+    stderr=None
+)
 
-# Test status
-print("\nTesting status...")
-response = send_native_message({"type": "status"})
-print(f"Response: {response}")
\ No newline at end of file
+try:
+    # Test ping
+    print("Testing ping...")
+    response = send_native_message(proc, {"type": "ping"})
+    print(f"Response: {response}")
+    
+    # Test status
+    print("\nTesting status...")
+    response = send_native_message(proc, {"type": "status"})
+    print(f"Response: {response}")
+finally:
+    proc.stdin.close()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
\ No newline at end of file